@@ -1,13 +1,23 @@
-﻿from flask import Flask, request, jsonify, session
+﻿from flask import Flask, Response, request, jsonify, session
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_caching import Cache
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 import sqlite3
 import os
-import uuid
-from datetime import datetime, timedelta
+import pathlib
+import queue
+import threading
+import time
 import sys
-import json
+import base64
+import binascii
+import secrets
+import orjson
 import traceback
+from contextlib import contextmanager
+from functools import partial
 
 # Add the ml directory to the path to import our models
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'ml'))
@@ -28,28 +38,146 @@ app.config.update(
 # Allow both localhost forms; adjust as needed for your frontend host/port
 CORS(app, supports_credentials=True, resources={r"/api/*": {"origins": ["http://127.0.0.1:5500"]}})
 
+# In-process cache for responses that rarely change (per worker process)
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
+QUESTIONS_CACHE_TIMEOUT = 3600
+LAST_PREDICTION_CACHE_TIMEOUT = 5
+
 # initialize ML integration objects
 disease_predictor = DiseasePredictionIntegration()
 mental_health_assessor = MentalHealthIntegration()
 fitness_recommender = FitnessIntegration()
 
+# orjson options keeping parity with what json.dumps accepted: numpy scalars
+# coming out of the ML models and non-string dict keys
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def to_json(obj):
+    """Serialize obj to a JSON string for storing in a TEXT column."""
+    return orjson.dumps(obj, option=ORJSON_OPTIONS).decode()
+
+def json_response(obj, status=200):
+    """Like jsonify, but serialized by orjson; used for the large payloads."""
+    return Response(orjson.dumps(obj, option=ORJSON_OPTIONS), status=status, mimetype='application/json')
+
 # Database path (project root / health.db)
+# (HEALTH_DB_PATH overrides it, e.g. to point tests at a scratch database)
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'health.db')
-DB_PATH = os.path.abspath(DB_PATH)
+DB_PATH = os.path.abspath(os.environ.get('HEALTH_DB_PATH', DB_PATH))
 
-# Helper: get a connection with sensible defaults to avoid "database is locked"
-def get_db_connection():
+# Helper: open a connection with sensible defaults to avoid "database is locked"
+def _create_connection(readonly=False):
     """
-    Returns a sqlite3 connection with:
+    Returns a new sqlite3 connection with:
       - row factory as sqlite3.Row
       - check_same_thread=False so different Flask threads can use connections safely
       - a generous timeout so SQLite waits instead of immediately throwing locked errors
-    IMPORTANT: Always close the connection (use with-statement or call conn.close()).
+      - per-connection PRAGMAs tuned for WAL mode (see init_db for journal_mode)
+      - mode=ro when readonly, so reader connections can never take the write lock
+      - otherwise isolation_level=None, so the driver never opens deferred transactions
+        on its own and get_writer() alone decides when BEGIN/COMMIT happen
+    Callers normally go through get_reader()/get_writer() instead of this.
     """
-    conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False)
+    if readonly:
+        uri = pathlib.Path(DB_PATH).as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, timeout=30, check_same_thread=False, cached_statements=256)
+    else:
+        conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False, cached_statements=256)
+        conn.isolation_level = None
     conn.row_factory = sqlite3.Row
+    # WAL makes NORMAL durable enough and avoids an fsync on every commit
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
     return conn
 
+class ConnectionPool:
+    """
+    Bounded pool of pre-configured sqlite3 connections.
+    Reusing connections skips connect/close on every request and keeps
+    SQLite's page cache warm between requests.
+    """
+
+    def __init__(self, factory, size):
+        self._factory = factory
+        self._size = size
+        self._pool = queue.Queue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def fill(self):
+        # open any connections that do not exist yet
+        while self._try_create():
+            pass
+
+    def _try_create(self):
+        with self._lock:
+            if self._created >= self._size:
+                return False
+            self._created += 1
+        try:
+            self._pool.put_nowait(self._factory())
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        return True
+
+    def acquire(self, timeout=30):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            self._try_create()
+        return self._pool.get(timeout=timeout)
+
+    def release(self, conn):
+        try:
+            # never hand out a connection with a half-finished transaction
+            conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._pool.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+# SQLite only ever allows one writer, so WAL readers fan out across a pool
+# while all writes are funnelled through a single connection (a pool of one).
+reader_pool = ConnectionPool(partial(_create_connection, readonly=True), size=os.cpu_count() or 1)
+writer_pool = ConnectionPool(_create_connection, size=1)
+
+def get_reader():
+    """
+    Borrow a read-only pooled connection. Use as a context manager; the
+    connection goes back to the pool on exit, so don't call conn.close() on it.
+    """
+    return reader_pool.connection()
+
+@contextmanager
+def get_writer():
+    """
+    Borrow the writer connection inside a BEGIN IMMEDIATE transaction.
+    Taking the write lock up front avoids deferred lock upgrades failing with
+    SQLITE_BUSY. Commits on a clean exit, rolls back if the block raises.
+    """
+    with writer_pool.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
 def init_db():
     try:
         schema_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'schema.sql')
@@ -59,36 +187,161 @@ def init_db():
             schema = f.read()
         # ensure idempotent CREATE TABLE statements
         schema = schema.replace("CREATE TABLE ", "CREATE TABLE IF NOT EXISTS ")
-        conn = get_db_connection()
-        try:
+        with writer_pool.connection() as conn:
+            # journal_mode is persistent in the database file, so set it once here
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.executescript(schema)
+            # CREATE TABLE IF NOT EXISTS leaves older databases with sessions stored as
+            # TEXT token / ISO expires_at; they can never authenticate and, since TEXT
+            # sorts above INTEGER, the expiry sweeper would never match them either
+            conn.execute(SQL_DELETE_LEGACY_SESSIONS)
             conn.commit()
-            print(f"✅ Database initialized successfully at {DB_PATH}")
-        finally:
-            conn.close()
+        threading.Thread(target=_evict_auth_cache, daemon=True).start()
+        threading.Thread(target=_sweep_expired_sessions, daemon=True).start()
+        # readers are opened read-only, so only create them once the file exists
+        reader_pool.fill()
+        print(f"✅ Database initialized successfully at {DB_PATH}")
     except Exception as e:
         print("❌ Error initializing database:", e)
         traceback.print_exc()
 
 # Utility to execute queries safely
 def execute_query(query, params=(), fetchone=False, fetchall=False, commit=False):
-    conn = get_db_connection()
-    try:
+    # writes go through the single writer connection, everything else to a reader
+    with (get_writer() if commit else get_reader()) as conn:
         cur = conn.cursor()
         cur.execute(query, params)
-        if commit:
-            conn.commit()
         if fetchone:
             return cur.fetchone()
         if fetchall:
             return cur.fetchall()
         # return cursor if caller needs lastrowid
         return cur
-    finally:
-        conn.close()
+
+# ------------------- SQL ------------------- #
+# Every statement lives in a module constant so each call reuses the exact same
+# string and hits the connection's prepared-statement cache instead of being
+# re-parsed and re-planned.
+
+SQL_SELECT_USER_BY_USERNAME = 'SELECT 1 FROM users WHERE username = ?'
+SQL_SELECT_USER_BY_EMAIL = 'SELECT 1 FROM users WHERE email = ?'
+SQL_INSERT_USER = 'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)'
+SQL_UPDATE_PASSWORD_HASH = 'UPDATE users SET password_hash = ? WHERE id = ?'
+SQL_LOGIN_USER = 'SELECT id, password_hash FROM users WHERE username = ?'
+SQL_INSERT_SESSION = 'INSERT INTO user_sessions (user_id, session_token, expires_at) VALUES (?, ?, ?)'
+SQL_DELETE_SESSION = 'DELETE FROM user_sessions WHERE user_id = ? AND session_token = ?'
+SQL_DELETE_EXPIRED_SESSIONS = 'DELETE FROM user_sessions WHERE expires_at < ?'
+SQL_DELETE_LEGACY_SESSIONS = "DELETE FROM user_sessions WHERE typeof(expires_at) = 'text' OR typeof(session_token) = 'text'"
+SQL_CHECK_AUTH = 'SELECT expires_at FROM user_sessions WHERE user_id = ? AND session_token = ?'
+SQL_LAST_PREDICTION = 'SELECT recommendations FROM disease_predictions WHERE user_id = ? ORDER BY created_at DESC LIMIT 1'
+
+SQL_INSERT_HEALTH_INPUT = '''INSERT INTO physical_health_inputs
+    (user_id, age, gender, height, weight, blood_pressure_systolic,
+     blood_pressure_diastolic, cholesterol_level, blood_sugar_level,
+     symptoms, family_history, lifestyle_factors)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+
+SQL_INSERT_PREDICTION = '''INSERT INTO disease_predictions
+    (user_id, health_input_id, predicted_diseases, risk_level,
+     confidence_score, recommendations)
+    VALUES (?, ?, ?, ?, ?, ?)'''
+
+SQL_INSERT_MH_RESPONSE = '''INSERT INTO mental_health_responses
+    (user_id, question_id, answer, score)
+    VALUES (?, ?, ?, ?)'''
+
+SQL_INSERT_MH_ASSESSMENT = '''INSERT INTO mental_health_assessments
+    (user_id, total_score, assessment_type, risk_level, recommendations)
+    VALUES (?, ?, ?, ?, ?)'''
+
+SQL_INSERT_FITNESS_PROFILE = '''INSERT INTO fitness_profiles
+    (user_id, age, gender, height, weight, activity_level,
+     fitness_goals, medical_conditions, dietary_restrictions)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+
+SQL_INSERT_DIET_PLAN = '''INSERT INTO diet_plans
+    (user_id, fitness_profile_id, plan_name, plan_type,
+     daily_calories, macronutrients, meal_plan, duration_weeks)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+
+SQL_INSERT_EXERCISE_ROUTINE = '''INSERT INTO exercise_routines
+    (user_id, fitness_profile_id, routine_name, routine_type,
+     exercises, duration_minutes, difficulty_level, frequency_per_week)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
 
 # ------------------- User Authentication ------------------- #
 
+# Recently validated (user_id, session_token) pairs -> unix time the entry stops
+# being trusted. Saves a user_sessions lookup on every authenticated request.
+AUTH_CACHE_TTL = 30
+_AUTH_CACHE = {}
+_auth_cache_lock = threading.Lock()
+
+def _evict_auth_cache():
+    # background loop so the cache can't grow without bound
+    while True:
+        time.sleep(AUTH_CACHE_TTL)
+        now = time.time()
+        with _auth_cache_lock:
+            for key in [k for k, until in _AUTH_CACHE.items() if until <= now]:
+                del _AUTH_CACHE[key]
+
+SESSION_LIFETIME = 24 * 60 * 60
+SESSION_SWEEP_INTERVAL = 60
+
+def _sweep_expired_sessions():
+    # one bulk DELETE per interval keeps writes off the check_auth read path
+    while True:
+        time.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            execute_query(SQL_DELETE_EXPIRED_SESSIONS, (int(time.time()),), commit=True)
+        except Exception:
+            traceback.print_exc()
+
+def _decode_session_token(session_token):
+    """
+    Session tokens are handed to clients as unpadded urlsafe base64 but stored
+    as the raw 16 bytes (BLOB). Returns the bytes, or None if malformed.
+    """
+    try:
+        padded = session_token + '=' * (-len(session_token) % 4)
+        return base64.urlsafe_b64decode(padded)
+    except (TypeError, ValueError, binascii.Error):
+        return None
+
+# argon2id for new hashes; rows created with werkzeug's PBKDF2 are still
+# accepted and upgraded the next time that user logs in.
+# Parameters are OWASP's argon2id baseline (19 MiB, 2 passes, 1 lane): ~20 ms
+# per verify vs ~175 ms for PBKDF2-SHA256 at 600k iterations, and 19 MiB per
+# concurrent login rather than argon2-cffi's default 64 MiB.
+password_hasher = PasswordHasher(time_cost=2, memory_cost=19 * 1024, parallelism=1)
+
+def verify_password(user, password):
+    """Check password against user's stored hash, rehashing it if outdated."""
+    stored_hash = user['password_hash']
+    if stored_hash.startswith('$argon2'):
+        try:
+            password_hasher.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        needs_rehash = password_hasher.check_needs_rehash(stored_hash)
+    else:
+        if not check_password_hash(stored_hash, password):
+            return False
+        needs_rehash = True
+
+    if needs_rehash:
+        try:
+            execute_query(
+                SQL_UPDATE_PASSWORD_HASH,
+                (password_hasher.hash(password), user['id']),
+                commit=True
+            )
+        except Exception:
+            # the password was correct; a failed upgrade shouldn't block login
+            traceback.print_exc()
+    return True
+
 @app.route('/api/auth/register', methods=['POST'])
 def register():
     data = request.get_json(force=True)
@@ -100,17 +353,18 @@ def register():
         return jsonify({'error': 'Missing required fields'}), 400
 
     try:
+        # two single-index lookups; an OR across columns can't use either index
         existing_user = execute_query(
-            'SELECT id FROM users WHERE username = ? OR email = ?',
-            (username, email),
-            fetchone=True
+            SQL_SELECT_USER_BY_USERNAME, (username,), fetchone=True
+        ) or execute_query(
+            SQL_SELECT_USER_BY_EMAIL, (email,), fetchone=True
         )
         if existing_user:
             return jsonify({'error': 'User already exists'}), 400
 
-        password_hash = generate_password_hash(password)
+        password_hash = password_hasher.hash(password)
         execute_query(
-            'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
+            SQL_INSERT_USER,
             (username, email, password_hash),
             commit=True
         )
@@ -126,20 +380,21 @@ def login():
     password = data.get('password')
 
     try:
-        user = execute_query('SELECT * FROM users WHERE username = ?', (username,), fetchone=True)
-        if user and check_password_hash(user['password_hash'], password):
+        user = execute_query(SQL_LOGIN_USER, (username,), fetchone=True)
+        if user and password and verify_password(user, password):
             # create session
-            session_token = str(uuid.uuid4())
+            token_bytes = secrets.token_bytes(16)
+            session_token = base64.urlsafe_b64encode(token_bytes).rstrip(b'=').decode()
             session['user_id'] = user['id']
             session['session_token'] = session_token
             session.permanent = True
 
-            expires_at = (datetime.utcnow() + timedelta(hours=24)).isoformat()
+            expires_at = int(time.time()) + SESSION_LIFETIME
 
-            # persist session (store expires_at as ISO string)
+            # persist session (store expires_at as unix epoch seconds)
             execute_query(
-                'INSERT INTO user_sessions (user_id, session_token, expires_at) VALUES (?, ?, ?)',
-                (user['id'], session_token, expires_at),
+                SQL_INSERT_SESSION,
+                (user['id'], sqlite3.Binary(token_bytes), expires_at),
                 commit=True
             )
             # Return session token; client should send cookies too for session
@@ -157,9 +412,11 @@ def logout():
 
     try:
         if user_id and session_token:
+            with _auth_cache_lock:
+                _AUTH_CACHE.pop((user_id, session_token), None)
             execute_query(
-                'DELETE FROM user_sessions WHERE user_id = ? AND session_token = ?',
-                (user_id, session_token),
+                SQL_DELETE_SESSION,
+                (user_id, _decode_session_token(session_token)),
                 commit=True
             )
     except Exception as e:
@@ -177,31 +434,29 @@ def check_auth():
     session_token = session.get('session_token')
     if not user_id or not session_token:
         return False
+    key = (user_id, session_token)
+    now = time.time()
+    with _auth_cache_lock:
+        if _AUTH_CACHE.get(key, 0) > now:
+            return True
+    token_bytes = _decode_session_token(session_token)
+    if token_bytes is None:
+        return False
     try:
         row = execute_query(
-            'SELECT * FROM user_sessions WHERE user_id = ? AND session_token = ?',
-            (user_id, session_token),
+            SQL_CHECK_AUTH,
+            (user_id, token_bytes),
             fetchone=True
         )
         if not row:
             return False
-        # Optionally check expiration
         expires_at = row['expires_at']
-        if expires_at:
-            try:
-                exp = datetime.fromisoformat(expires_at)
-                if datetime.utcnow() > exp:
-                    # expired
-                    # remove expired session
-                    execute_query(
-                        'DELETE FROM user_sessions WHERE user_id = ? AND session_token = ?',
-                        (user_id, session_token),
-                        commit=True
-                    )
-                    return False
-            except Exception:
-                # if parsing fails, still accept for compatibility; but consider fixing stored format
-                pass
+        if expires_at < now:
+            # expired; the row itself is removed by _sweep_expired_sessions
+            return False
+        # don't trust the cached entry past the session's own expiry
+        with _auth_cache_lock:
+            _AUTH_CACHE[key] = min(now + AUTH_CACHE_TTL, expires_at)
         return True
     except Exception as e:
         traceback.print_exc()
@@ -225,83 +480,84 @@ def predict_disease():
             symptoms_list = [s.strip() for s in symptoms_input.split(',') if s.strip()]
         else:
             symptoms_list = []
+    elif all(isinstance(s, str) for s in symptoms_input):
+        # already a list of strings (the usual case); no need to copy it
+        symptoms_list = symptoms_input
     else:
         symptoms_list = [str(s) for s in symptoms_input]
 
-    symptoms_json = json.dumps(symptoms_list, ensure_ascii=False)
+    if not symptoms_list:
+        return jsonify({'error': 'No symptoms provided'}), 400
 
+    # run inference before touching the DB so no write lock is held meanwhile
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            '''INSERT INTO physical_health_inputs
-               (user_id, age, gender, height, weight, blood_pressure_systolic,
-                blood_pressure_diastolic, cholesterol_level, blood_sugar_level,
-                symptoms, family_history, lifestyle_factors)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            (
-                user_id,
-                data.get('age'),
-                data.get('gender'),
-                data.get('height'),
-                data.get('weight'),
-                data.get('bp_systolic'),
-                data.get('bp_diastolic'),
-                data.get('cholesterol'),
-                data.get('blood_sugar'),
-                symptoms_json,
-                data.get('family_history'),
-                json.dumps(data.get('lifestyle_factors')) if data.get('lifestyle_factors') is not None else None
-            )
-        )
-        conn.commit()
-        health_input_id = cur.lastrowid
+        prediction_result = disease_predictor.predict_disease_with_recommendations(symptoms_list)
     except Exception as e:
         traceback.print_exc()
-        return jsonify({'error': 'DB error while saving health input: ' + str(e)}), 500
-    finally:
-        conn.close()
+        return jsonify({'error': str(e)}), 500
 
-    try:
-        prediction_result = disease_predictor.predict_disease_with_recommendations(symptoms_list)
+    if 'error' in prediction_result:
+        return jsonify({'error': prediction_result['error']}), 400
 
-        if 'error' in prediction_result:
-            return jsonify({'error': prediction_result['error']}), 400
+    # encode once; the same bytes are stored and sent back to the client
+    payload = orjson.dumps(prediction_result, option=ORJSON_OPTIONS)
+    symptoms_json = to_json(symptoms_list)
 
-        # store full prediction_result as JSON string
-        try:
-            conn2 = get_db_connection()
-            cur2 = conn2.cursor()
-            cur2.execute(
-                '''INSERT INTO disease_predictions
-                   (user_id, health_input_id, predicted_diseases, risk_level,
-                    confidence_score, recommendations)
-                   VALUES (?, ?, ?, ?, ?, ?)''',
+    # health input and prediction are saved together in one transaction
+    try:
+        with get_writer() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                SQL_INSERT_HEALTH_INPUT,
+                (
+                    user_id,
+                    data.get('age'),
+                    data.get('gender'),
+                    data.get('height'),
+                    data.get('weight'),
+                    data.get('bp_systolic'),
+                    data.get('bp_diastolic'),
+                    data.get('cholesterol'),
+                    data.get('blood_sugar'),
+                    symptoms_json,
+                    data.get('family_history'),
+                    to_json(data.get('lifestyle_factors')) if data.get('lifestyle_factors') is not None else None
+                )
+            )
+            health_input_id = cur.lastrowid
+
+            # store full prediction_result as JSON string
+            cur.execute(
+                SQL_INSERT_PREDICTION,
                 (
                     user_id,
                     health_input_id,
-                    json.dumps(prediction_result.get('predicted_disease')),  # could be list or str
+                    to_json(prediction_result.get('predicted_disease')),  # could be list or str
                     prediction_result.get('risk_level', 'medium'),
                     float(prediction_result.get('confidence_score', 0.0)),
-                    json.dumps(prediction_result)
+                    payload.decode()
                 )
             )
-            conn2.commit()
-        finally:
-            conn2.close()
-
-        return jsonify(prediction_result)
     except Exception as e:
         traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        return jsonify({'error': 'DB error while saving prediction: ' + str(e)}), 500
+
+    # a fresh prediction supersedes whatever last-prediction has cached
+    cache.delete(f'last_prediction:{user_id}')
+    return Response(payload, mimetype='application/json')
 
 # ------------------- Mental Health ------------------- #
 @app.route('/api/mental-health/questions', methods=['GET'])
 def get_mental_health_questions():
     if not check_auth():
         return jsonify({'error': 'Not authenticated'}), 401
-    questions = mental_health_assessor.get_assessment_questions()
-    return jsonify(questions)
+    # cached after the auth check so unauthenticated callers never get a hit
+    payload = cache.get('mh_questions')
+    if payload is None:
+        questions = mental_health_assessor.get_assessment_questions()
+        payload = orjson.dumps(questions, option=ORJSON_OPTIONS)
+        cache.set('mh_questions', payload, timeout=QUESTIONS_CACHE_TIMEOUT)
+    return Response(payload, mimetype='application/json')
 
 @app.route('/api/mental-health/submit-quiz', methods=['POST'])
 def submit_mental_health_quiz():
@@ -316,35 +572,27 @@ def submit_mental_health_quiz():
     assessment_result = mental_health_assessor.get_mental_health_recommendations(total_score, category_scores)
 
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        for response in responses:
-            question_id = response.get('question_id')
-            answer = response.get('answer')
-            answer_index = response.get('answer_index', 0)
-            score = response.get('score', 0)
-            cur.execute(
-                '''INSERT INTO mental_health_responses
-                   (user_id, question_id, answer, score)
-                   VALUES (?, ?, ?, ?)''',
-                (user_id, question_id, answer, score)
+        with get_writer() as conn:
+            cur = conn.cursor()
+            # one executemany call for the whole quiz instead of a round-trip per answer
+            cur.executemany(
+                SQL_INSERT_MH_RESPONSE,
+                [
+                    (user_id, response.get('question_id'), response.get('answer'), response.get('score', 0))
+                    for response in responses
+                ]
             )
 
-        cur.execute(
-            '''INSERT INTO mental_health_assessments
-               (user_id, total_score, assessment_type, risk_level, recommendations)
-               VALUES (?, ?, ?, ?, ?)''',
-            (user_id, total_score, 'general', assessment_result.get('risk_level'),
-             json.dumps(assessment_result.get('recommendations')))
-        )
-        conn.commit()
+            cur.execute(
+                SQL_INSERT_MH_ASSESSMENT,
+                (user_id, total_score, 'general', assessment_result.get('risk_level'),
+                 to_json(assessment_result.get('recommendations')))
+            )
     except Exception as e:
         traceback.print_exc()
         return jsonify({'error': 'DB error while saving mental health results: ' + str(e)}), 500
-    finally:
-        conn.close()
 
-    return jsonify(assessment_result)
+    return json_response(assessment_result)
 
 @app.route('/api/mental-health/analyze-text', methods=['POST'])
 def analyze_text_sentiment():
@@ -359,14 +607,20 @@ def get_last_prediction():
   if not check_auth():
     return jsonify({'error': 'Not authenticated'}), 401
   user_id = session.get('user_id')
-  row = execute_query(
-    'SELECT recommendations FROM disease_predictions WHERE user_id = ? ORDER BY created_at DESC LIMIT 1',
-    (user_id,),
-    fetchone=True
-  )
-  if row:
-    return jsonify(json.loads(row['recommendations']))
-  return jsonify({'error': 'No previous predictions'}), 404
+  cache_key = f'last_prediction:{user_id}'
+  recommendations = cache.get(cache_key)
+  if recommendations is None:
+    row = execute_query(
+      SQL_LAST_PREDICTION,
+      (user_id,),
+      fetchone=True
+    )
+    if not row:
+      return jsonify({'error': 'No previous predictions'}), 404
+    recommendations = row['recommendations']
+    cache.set(cache_key, recommendations, timeout=LAST_PREDICTION_CACHE_TIMEOUT)
+  # already stored as JSON text; hand it back without a parse/re-encode round trip
+  return Response(recommendations, mimetype='application/json')
 
 
 # ------------------- Fitness ------------------- #
@@ -378,32 +632,26 @@ def create_fitness_profile():
     user_id = session.get('user_id')
 
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            '''INSERT INTO fitness_profiles
-               (user_id, age, gender, height, weight, activity_level,
-                fitness_goals, medical_conditions, dietary_restrictions)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            (
-                user_id,
-                data.get('age'),
-                data.get('gender'),
-                data.get('height'),
-                data.get('weight'),
-                data.get('activity_level'),
-                data.get('fitness_goals'),
-                json.dumps(data.get('medical_conditions')) if data.get('medical_conditions') is not None else None,
-                json.dumps(data.get('dietary_restrictions')) if data.get('dietary_restrictions') is not None else None
+        with get_writer() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                SQL_INSERT_FITNESS_PROFILE,
+                (
+                    user_id,
+                    data.get('age'),
+                    data.get('gender'),
+                    data.get('height'),
+                    data.get('weight'),
+                    data.get('activity_level'),
+                    data.get('fitness_goals'),
+                    to_json(data.get('medical_conditions')) if data.get('medical_conditions') is not None else None,
+                    to_json(data.get('dietary_restrictions')) if data.get('dietary_restrictions') is not None else None
+                )
             )
-        )
-        conn.commit()
-        profile_id = cur.lastrowid
+            profile_id = cur.lastrowid
     except Exception as e:
         traceback.print_exc()
         return jsonify({'error': 'DB error while creating fitness profile: ' + str(e)}), 500
-    finally:
-        conn.close()
 
     return jsonify({'profile_id': profile_id, 'message': 'Fitness profile created'})
 
@@ -422,57 +670,49 @@ def get_fitness_recommendations():
 
     # Persist diet plan and exercise routine as JSON strings for list/dict fields
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
         diet_plan = fitness_recommendations.get('diet_plan', {})
         exercise_plan = fitness_recommendations.get('exercise_plan', {})
-
-        cur.execute(
-            '''INSERT INTO diet_plans
-               (user_id, fitness_profile_id, plan_name, plan_type,
-                daily_calories, macronutrients, meal_plan, duration_weeks)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-            (
-                user_id,
-                data.get('profile_id'),
-                'Personalized Diet Plan',
-                'Balanced',
-                diet_plan.get('daily_calories'),
-                json.dumps(diet_plan.get('macronutrients')) if diet_plan.get('macronutrients') is not None else None,
-                json.dumps(diet_plan.get('meal_plan')) if diet_plan.get('meal_plan') is not None else None,
-                diet_plan.get('duration_weeks', 4)
-            )
+        # build both rows up front so the write transaction only runs the two inserts
+        diet_row = (
+            user_id,
+            data.get('profile_id'),
+            'Personalized Diet Plan',
+            'Balanced',
+            diet_plan.get('daily_calories'),
+            to_json(diet_plan.get('macronutrients')) if diet_plan.get('macronutrients') is not None else None,
+            to_json(diet_plan.get('meal_plan')) if diet_plan.get('meal_plan') is not None else None,
+            diet_plan.get('duration_weeks', 4)
         )
-
-        cur.execute(
-            '''INSERT INTO exercise_routines
-               (user_id, fitness_profile_id, routine_name, routine_type,
-                exercises, duration_minutes, difficulty_level, frequency_per_week)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-            (
-                user_id,
-                data.get('profile_id'),
-                'Personalized Exercise Routine',
-                'Mixed',
-                json.dumps(exercise_plan.get('exercises')) if exercise_plan.get('exercises') is not None else None,
-                exercise_plan.get('duration_minutes'),
-                exercise_plan.get('intensity'),
-                exercise_plan.get('frequency_per_week')
-            )
+        exercise_row = (
+            user_id,
+            data.get('profile_id'),
+            'Personalized Exercise Routine',
+            'Mixed',
+            to_json(exercise_plan.get('exercises')) if exercise_plan.get('exercises') is not None else None,
+            exercise_plan.get('duration_minutes'),
+            exercise_plan.get('intensity'),
+            exercise_plan.get('frequency_per_week')
         )
 
-        conn.commit()
+        with get_writer() as conn:
+            cur = conn.cursor()
+            cur.execute(SQL_INSERT_DIET_PLAN, diet_row)
+            cur.execute(SQL_INSERT_EXERCISE_ROUTINE, exercise_row)
     except Exception as e:
         traceback.print_exc()
         return jsonify({'error': 'DB error while saving fitness recommendations: ' + str(e)}), 500
-    finally:
-        conn.close()
 
-    return jsonify(fitness_recommendations)
+    return json_response(fitness_recommendations)
 
 # ------------------- Run App ------------------- #
+# Initialise on import so WSGI servers get the schema, pools and background
+# threads too. Under gunicorn this runs once per worker (see gunicorn.conf.py);
+# don't use --preload, connections and threads must not cross a fork.
+init_db()
+
 if __name__ == '__main__':
-    init_db()
+    # Development server only; production runs under gunicorn:
+    #   gunicorn -c gunicorn.conf.py app:app
     # Note: use_reloader=False prevents Flask from launching the app twice in debug mode,
     # which can cause SQLite locking issues when using a file DB.
-    app.run(debug=True, port=5000, use_reloader=False)
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', port=5000, use_reloader=False)
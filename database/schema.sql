@@ -149,8 +149,16 @@ CREATE TABLE combined_recommendations (
 CREATE TABLE user_sessions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL,
-    session_token TEXT UNIQUE NOT NULL,
-    expires_at TIMESTAMP NOT NULL,
+    session_token BLOB UNIQUE NOT NULL,
+    expires_at INTEGER NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
+
+-- Indexes for the per-request auth and history lookups
+-- (users.username, users.email and user_sessions.session_token are already
+-- indexed through their UNIQUE constraints; check_auth uses the session_token one)
+-- idx_sessions_user_token was never picked by the planner, drop it where it exists
+DROP INDEX IF EXISTS idx_sessions_user_token;
+CREATE INDEX IF NOT EXISTS idx_pred_user_created ON disease_predictions(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires ON user_sessions(expires_at);
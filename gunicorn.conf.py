@@ -0,0 +1,16 @@
+# Production server settings: gunicorn -c gunicorn.conf.py app:app
+import multiprocessing
+
+bind = '127.0.0.1:5000'
+
+# one process per core, each serving requests on a pool of threads;
+# SQLite in WAL mode lets the workers read concurrently
+workers = multiprocessing.cpu_count()
+worker_class = 'gthread'
+threads = 8
+
+# heartbeat files on tmpfs so a slow disk can't stall workers
+worker_tmp_dir = '/dev/shm'
+
+# keep False: each worker must open its own SQLite connections and threads
+preload_app = False
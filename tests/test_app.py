@@ -0,0 +1,188 @@
+"""Smoke tests: one request per endpoint against a scratch database.
+
+The ML integration modules live outside this repo (../ml), so small stand-ins
+are registered in sys.modules before app is imported.
+"""
+import os
+import sys
+import types
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_caching')
+pytest.importorskip('argon2')
+
+
+class DiseasePredictionIntegration:
+    def predict_disease_with_recommendations(self, symptoms):
+        return {
+            'predicted_disease': 'Common Cold',
+            'risk_level': 'low',
+            'confidence_score': 0.8,
+            'recommendations': ['rest', 'fluids'],
+            'symptoms': symptoms,
+        }
+
+
+class MentalHealthIntegration:
+    def get_assessment_questions(self):
+        return [{'id': 1, 'question': 'How often do you feel anxious?', 'options': ['Never', 'Always']}]
+
+    def calculate_mental_health_score(self, responses):
+        return sum(r.get('score', 0) for r in responses), {}
+
+    def get_mental_health_recommendations(self, total_score, category_scores):
+        return {'total_score': total_score, 'risk_level': 'low', 'recommendations': ['keep it up']}
+
+    def analyze_text_sentiment(self, text):
+        return {'sentiment': 'neutral', 'text': text}
+
+
+class FitnessIntegration:
+    def get_fitness_recommendations(self, data):
+        return {
+            'diet_plan': {'daily_calories': 2000, 'macronutrients': {'protein': 150}, 'meal_plan': ['oats']},
+            'exercise_plan': {'exercises': ['squats'], 'duration_minutes': 30, 'intensity': 'medium',
+                              'frequency_per_week': 3},
+        }
+
+
+@pytest.fixture(scope='module')
+def app_module(tmp_path_factory):
+    os.environ['HEALTH_DB_PATH'] = str(tmp_path_factory.mktemp('db') / 'health.db')
+    for name, cls in [('disease_prediction_integration', DiseasePredictionIntegration),
+                      ('mental_health_integration', MentalHealthIntegration),
+                      ('fitness_integration', FitnessIntegration)]:
+        module = types.ModuleType(name)
+        setattr(module, cls.__name__, cls)
+        sys.modules[name] = module
+    sys.modules.pop('app', None)
+    import app
+    yield app
+    sys.modules.pop('app', None)
+    del os.environ['HEALTH_DB_PATH']
+
+
+@pytest.fixture(scope='module')
+def client(app_module):
+    client = app_module.app.test_client()
+    resp = client.post('/api/auth/register', json={'username': 'alice', 'email': 'alice@example.com',
+                                                   'password': 'secret'})
+    assert resp.status_code == 201
+    resp = client.post('/api/auth/login', json={'username': 'alice', 'password': 'secret'})
+    assert resp.status_code == 200
+    assert resp.get_json()['session_token']
+    return client
+
+
+def test_register_duplicate(client):
+    resp = client.post('/api/auth/register', json={'username': 'alice', 'email': 'other@example.com',
+                                                   'password': 'x'})
+    assert resp.status_code == 400
+
+
+def test_login_wrong_password(app_module):
+    resp = app_module.app.test_client().post('/api/auth/login', json={'username': 'alice', 'password': 'nope'})
+    assert resp.status_code == 401
+
+
+def test_requires_auth(app_module):
+    resp = app_module.app.test_client().get('/api/mental-health/questions')
+    assert resp.status_code == 401
+
+
+def test_predict_disease_and_last_prediction(client):
+    resp = client.post('/api/health/predict-disease', json={'symptoms': ['cough', 'fever'], 'age': 30})
+    assert resp.status_code == 200
+    assert resp.get_json()['predicted_disease'] == 'Common Cold'
+
+    resp = client.get('/api/health/last-prediction')
+    assert resp.status_code == 200
+    assert resp.get_json()['symptoms'] == ['cough', 'fever']
+
+
+def test_predict_disease_without_symptoms(client):
+    resp = client.post('/api/health/predict-disease', json={'symptoms': []})
+    assert resp.status_code == 400
+
+
+def test_mental_health_questions(client):
+    resp = client.get('/api/mental-health/questions')
+    assert resp.status_code == 200
+    assert resp.get_json()[0]['id'] == 1
+
+
+def test_submit_quiz(client):
+    resp = client.post('/api/mental-health/submit-quiz', json={'responses': []})
+    assert resp.status_code == 200
+    assert resp.get_json()['risk_level'] == 'low'
+
+
+def test_analyze_text(client):
+    resp = client.post('/api/mental-health/analyze-text', json={'text': 'fine'})
+    assert resp.status_code == 200
+    assert resp.get_json()['sentiment'] == 'neutral'
+
+
+def test_fitness_profile_and_recommendations(client):
+    resp = client.post('/api/fitness/profile', json={'age': 30, 'medical_conditions': ['asthma']})
+    assert resp.status_code == 200
+    profile_id = resp.get_json()['profile_id']
+
+    resp = client.post('/api/fitness/recommendations', json={'profile_id': profile_id})
+    assert resp.status_code == 200
+    assert resp.get_json()['diet_plan']['daily_calories'] == 2000
+
+
+def test_logout(app_module):
+    client = app_module.app.test_client()
+    client.post('/api/auth/login', json={'username': 'alice', 'password': 'secret'})
+    assert client.get('/api/mental-health/questions').status_code == 200
+    assert client.post('/api/auth/logout').status_code == 200
+    assert client.get('/api/mental-health/questions').status_code == 401
+
+
+def test_submit_quiz_with_question_ids(client):
+    # questions come from the ML module, not mental_health_questions
+    resp = client.post('/api/mental-health/submit-quiz', json={'responses': [
+        {'question_id': 1, 'answer': 'Never', 'score': 0},
+        {'question_id': 2, 'answer': 'Good', 'score': 3},
+    ]})
+    assert resp.status_code == 200
+    assert resp.get_json()['total_score'] == 3
+
+
+def test_fitness_recommendations_unknown_profile(client):
+    resp = client.post('/api/fitness/recommendations', json={'profile_id': 99})
+    assert resp.status_code == 200
+
+
+def test_login_upgrades_legacy_pbkdf2_hash(app_module):
+    from werkzeug.security import generate_password_hash
+
+    app_module.execute_query(
+        app_module.SQL_INSERT_USER,
+        ('bob', 'bob@example.com', generate_password_hash('hunter2')),
+        commit=True
+    )
+    resp = app_module.app.test_client().post('/api/auth/login', json={'username': 'bob', 'password': 'hunter2'})
+    assert resp.status_code == 200
+
+    row = app_module.execute_query(app_module.SQL_LOGIN_USER, ('bob',), fetchone=True)
+    assert row['password_hash'].startswith('$argon2id$')
+    assert 'm=19456,t=2,p=1' in row['password_hash']
+
+
+def test_init_db_removes_legacy_sessions(app_module):
+    app_module.execute_query(
+        app_module.SQL_INSERT_SESSION,
+        (1, 'legacy-uuid-token', '2024-01-01T00:00:00'),
+        commit=True
+    )
+    app_module.init_db()
+    row = app_module.execute_query(
+        "SELECT COUNT(*) FROM user_sessions WHERE typeof(session_token) = 'text'",
+        fetchone=True
+    )
+    assert row[0] == 0